@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+
+from bench_ml_features import load_gold_digger
+from fake_exchange import HOUR_MS, FakeExchange, plug_in
+
+MODES = ('strike', 'sequential', 'pipelined', 'concurrent')
+
+def run_scenario(gd, mode: str, symbol_count: int, timeframe: str, days: int, args) -> dict:
+    """Mine symbol_count fake symbols into a fresh vault and time it end to end"""
+    symbols = [f"C{i:04d}/USDT" for i in range(symbol_count)]
+    with tempfile.TemporaryDirectory() as vault_dir:
+        digger = gd.GoldDigger(os.path.join(vault_dir, "bench_vault.db"),
+                               candle_cache_dir=os.path.join(vault_dir, "candles") if args.candle_cache else None,
+                               market_cache_dir=None, metrics_path=None)
+        digger.log_funny = lambda message, level="info": None
+        plug_in(digger, FakeExchange(symbols, history_days=days, latency=args.latency,
+                                     page_limit=args.page_limit), args.rate_limited)
+        np.random.seed(0)
+
+        metrics_start = digger.metrics.snapshot()
+        symbol_seconds = []
+        started = time.perf_counter()
+        if mode == 'strike':
+            for symbol in symbols:
+                symbol_started = time.perf_counter()
+                digger.strike_gold_for_symbol(symbol, days, timeframe=timeframe)
+                symbol_seconds.append(time.perf_counter() - symbol_started)
+        else:
+            digger.launch_full_mining_expedition(top_n=symbol_count, days=days, timeframe=timeframe,
+                                                 concurrent=mode == 'concurrent', pipelined=mode == 'pipelined',
+                                                 max_concurrency=args.concurrency)
+        elapsed = time.perf_counter() - started
+        report = digger.metrics.report(metrics_start, elapsed)
+        digger.close()
+
+    result = {
+        'mode': mode,
+        'timeframe': timeframe,
+        'symbols': symbol_count,
+        'days': days,
+        'seconds': elapsed,
+        'symbols_per_second': symbol_count / elapsed,
+        'rows_written': report['rows_written'],
+        'rows_per_second': report['rows_per_second'],
+        'exchange_requests': report['exchange_requests'],
+        'stages': report['stages'],
+    }
+    if symbol_seconds:
+        result['symbol_ms'] = {
+            'mean': float(np.mean(symbol_seconds)) * 1000,
+            'p50': float(np.percentile(symbol_seconds, 50)) * 1000,
+            'p95': float(np.percentile(symbol_seconds, 95)) * 1000,
+            'max': float(np.max(symbol_seconds)) * 1000,
+        }
+    return result
+
+def check_split_cache(gd, page_limit: int) -> dict:
+    """Dig 1 day, 1 day again 10 days later, then 30 days: the cache must fill the hole between the first two"""
+    symbol = 'C0000/USDT'
+    now = time.time()
+    clock = [now]
+    with tempfile.TemporaryDirectory() as vault_dir:
+        digger = gd.GoldDigger(os.path.join(vault_dir, "bench_vault.db"),
+                               candle_cache_dir=os.path.join(vault_dir, "candles"),
+                               market_cache_dir=None, metrics_path=None)
+        digger.log_funny = lambda message, level="info": None
+        exchange = FakeExchange([symbol], history_days=45, page_limit=page_limit, clock=lambda: clock[0])
+        plug_in(digger, exchange)
+
+        clock[0] = now - 10 * 24 * 3600
+        digger.dig_historical_gold(symbol, '1h', days=1, exchange_name=exchange.id)
+        clock[0] = now
+        digger.dig_historical_gold(symbol, '1h', days=1, exchange_name=exchange.id)
+        df = digger.dig_historical_gold(symbol, '1h', days=30, exchange_name=exchange.id)
+        spans = digger.candle_cache.spans(exchange.id, symbol, '1h')
+        digger.close()
+
+    steps = np.diff(df['timestamp'].to_numpy().astype('datetime64[ms]').astype('int64'))
+    widest_ms = int(steps.max()) if len(steps) else 0
+    assert widest_ms == HOUR_MS, f"split-window dig left a {widest_ms / HOUR_MS:.0f}h hole"
+    assert len(df) >= 30 * 24, f"split-window dig returned {len(df)} rows for 30 days"
+    assert len(spans) == 1, f"cache still holds {len(spans)} separate spans"
+    return {'rows': len(df), 'widest_step_h': widest_ms / HOUR_MS, 'spans': len(spans)}
+
+def scenario_key(result: dict) -> tuple:
+    return result['mode'], result['timeframe'], result['symbols'], result['days']
+
+def compare(results: list, baseline_path: str):
+    """Print each scenario's speed against the same scenario in an earlier results file"""
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = {scenario_key(result): result for result in json.load(baseline_file)['scenarios']}
+    for result in results:
+        before = baseline.get(scenario_key(result))
+        if before is None:
+            continue
+        speedup = before['seconds'] / result['seconds']
+        print(f"⚖️ {result['mode']:>10} {result['timeframe']:>3} x{result['symbols']:<5}: "
+              f"{before['seconds']:8.2f}s -> {result['seconds']:8.2f}s ({speedup:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Gold-Digger expeditions end to end against a fake exchange")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--timeframes", nargs="+", default=["1h", "1m"])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--days-1h", type=int, default=30, help="days mined per 1h scenario")
+    parser.add_argument("--days-1m", type=int, default=1, help="days mined per 1m (and other) scenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each fake exchange call takes")
+    parser.add_argument("--page-limit", type=int, default=None, help="most candles per fetch_ohlcv (default: no cap)")
+    parser.add_argument("--concurrency", type=int, default=10, help="diggers for the pipelined and concurrent modes")
+    parser.add_argument("--rate-limited", action="store_true", help="keep the real exchange rate budget")
+    parser.add_argument("--candle-cache", action="store_true", help="run with the raw candle cache on")
+    parser.add_argument("--out", default=None, help="results file (default: bench_expeditions_<time>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    gd = load_gold_digger()
+    if args.candle_cache:
+        split = check_split_cache(gd, args.page_limit or 100)
+        print(f"🧩 split-window cache: {split['rows']} rows over 30 days, widest step {split['widest_step_h']:.0f}h, "
+              f"{split['spans']} cached span")
+    results = []
+    for timeframe in args.timeframes:
+        days = args.days_1h if timeframe == '1h' else args.days_1m
+        for symbol_count in args.symbols:
+            for mode in args.modes:
+                result = run_scenario(gd, mode, symbol_count, timeframe, days, args)
+                results.append(result)
+                print(f"⛏️ {mode:>10} {timeframe:>3} x{symbol_count:<5}: {result['seconds']:8.2f}s, "
+                      f"{result['symbols_per_second']:8.1f} symbols/s, {result['rows_per_second']:>10,.0f} rows/s")
+
+    out_path = args.out or f"bench_expeditions_{int(time.time())}.json"
+    with open(out_path, 'w', encoding='utf-8') as out_file:
+        json.dump({
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {key: value for key, value in vars(args).items() if key not in ('out', 'baseline')},
+            'scenarios': results,
+        }, out_file, indent=2)
+    print(f"💾 Results saved to {out_path}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+def load_gold_digger():
+    """Import gold-digger.py (its file name isn't a valid module name)"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gold-digger.py")
+    spec = importlib.util.spec_from_file_location("gold_digger", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["gold_digger"] = module
+    spec.loader.exec_module(module)
+    return module
+
+def synthetic_candles(n: int, seed: int = 7) -> pd.DataFrame:
+    """Random-walk 1h candles with occasional volume spikes"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    volume = rng.lognormal(3, 0.5, n)
+    volume[rng.random(n) < 0.03] *= rng.uniform(2, 8)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2020-01-01', periods=n, freq='h'),
+        'open': close * (1 + rng.normal(0, 0.002, n)),
+        'high': close * (1 + np.abs(rng.normal(0, 0.005, n))),
+        'low': close * (1 - np.abs(rng.normal(0, 0.005, n))),
+        'close': close,
+        'volume': volume,
+        'symbol': 'BENCH/USDT',
+    })
+
+def legacy_feature_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """The original per-row create_ml_features loop, kept as the reference"""
+    records = []
+    for idx in range(25, len(df) - 25):
+        row = df.iloc[idx]
+        features = {
+            'price_momentum_5': df.iloc[idx-5:idx]['close'].pct_change().mean(),
+            'price_momentum_10': df.iloc[idx-10:idx]['close'].pct_change().mean(),
+            'volume_trend_5': df.iloc[idx-5:idx]['volume_ratio'].mean(),
+            'volume_trend_10': df.iloc[idx-10:idx]['volume_ratio'].mean(),
+            'rsi_current': row['rsi'] if 'rsi' in row else 50,
+            'bb_position': row['bb_position'] if 'bb_position' in row else 0.5,
+            'macd_signal': 1 if row['macd'] > row['macd_signal'] else 0,
+            'volume_breakout_score': row['volume_breakout_score'] if 'volume_breakout_score' in row else 0,
+            'volatility': row['volatility'] if 'volatility' in row else 0,
+            'trend_strength': row['trend_strength'] if 'trend_strength' in row else 0
+        }
+        future_1h = df.iloc[idx+1]
+        future_24h = df.iloc[min(idx+24, len(df)-1)]
+        records.append({
+            **features,
+            'target_breakout_1h': float(future_1h['volume_breakout_score'] > 70),
+            'target_breakout_24h': float(future_24h['volume_breakout_score'] > 70),
+            'target_price_change_1h': float(future_1h['price_change_1h']),
+            'target_price_change_24h': float(future_24h['price_change_24h']),
+        })
+    return pd.DataFrame(records)
+
+def main():
+    gd = load_gold_digger()
+    with tempfile.TemporaryDirectory() as vault_dir:
+        digger = gd.GoldDigger(os.path.join(vault_dir, "bench_vault.db"), candle_cache_dir=None)
+        digger.log_funny = lambda message, level="info": None
+
+        value_columns = gd.ML_FEATURE_COLUMNS + ['target_breakout_1h', 'target_breakout_24h',
+                                                 'target_price_change_1h', 'target_price_change_24h']
+        results = {}
+        for n in (10_000, 100_000, 1_000_000):
+            df = digger.calculate_volume_jackpot_score(digger.forge_technical_weapons(synthetic_candles(n)))
+
+            started = time.perf_counter()
+            frame = digger.build_ml_feature_frame(df)
+            elapsed = time.perf_counter() - started
+            results[n] = {'rows': len(frame), 'seconds': elapsed, 'rows_per_second': len(frame) / elapsed}
+            print(f"🧠 {n:>9,} candles: {len(frame):>9,} feature rows in {elapsed:7.3f}s "
+                  f"-> {len(frame) / elapsed:>12,.0f} rows/s")
+
+            if n == 10_000:
+                started = time.perf_counter()
+                legacy = legacy_feature_rows(df)
+                legacy_elapsed = time.perf_counter() - started
+                identical = np.array_equal(legacy[value_columns].to_numpy(),
+                                           frame[value_columns].to_numpy(dtype='float64'), equal_nan=True)
+                results[n]['legacy_rows_per_second'] = len(legacy) / legacy_elapsed
+                results[n]['identical_to_legacy'] = identical
+                print(f"🐢 {n:>9,} candles: legacy loop {len(legacy) / legacy_elapsed:>12,.0f} rows/s "
+                      f"(identical values: {identical})")
+
+        print(json.dumps({str(n): result for n, result in results.items()}, indent=2))
+
+if __name__ == "__main__":
+    main()
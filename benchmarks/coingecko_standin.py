@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from bench_ml_features import load_gold_digger
+
+class CoinGeckoStandIn(ThreadingHTTPServer):
+    """Local stand-in for CoinGecko's /coins/markets, on a free port 🦎
+
+    Serves a ranking of coin_count made-up coins, per_page at a time, with an
+    ETag per ranking version (If-None-Match gets a 304). throttle answers the
+    next that many requests with a 429, and down answers everything with a
+    503 - both with Retry-After: 1, which keeps the scout's retries to a
+    second each instead of its exponential backoff. Every request is logged
+    with the client port it came in on.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, coin_count: int = 600):
+        super().__init__(('127.0.0.1', 0), CoinGeckoHandler)
+        self.coin_count = coin_count
+        self.version = 1
+        self.throttle = 0
+        self.down = False
+        self.requests = []
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v3"
+
+    def start(self) -> 'CoinGeckoStandIn':
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def etag(self) -> str:
+        return f'"ranking-v{self.version}"'
+
+    def ranking(self, page: int, per_page: int) -> list:
+        first = (page - 1) * per_page
+        return [{'id': f"coin-{rank}", 'symbol': f"c{rank}", 'market_cap_rank': rank}
+                for rank in range(first + 1, min(first + per_page, self.coin_count) + 1)]
+
+    def statuses(self) -> list:
+        with self.lock:
+            return [request['status'] for request in self.requests]
+
+class CoinGeckoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status: int, body: bytes = b'', headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        with server.lock:
+            if server.down:
+                status = 503
+            elif server.throttle:
+                server.throttle -= 1
+                status = 429
+            elif not url.path.endswith('/coins/markets'):
+                status = 404
+            elif self.headers.get('If-None-Match') == server.etag():
+                status = 304
+            else:
+                status = 200
+            server.requests.append({'port': self.client_address[1], 'page': int(query.get('page', 1)),
+                                    'status': status, 'if_none_match': self.headers.get('If-None-Match')})
+
+        if status in (429, 503):
+            self.reply(status, headers={'Retry-After': '1'})
+        elif status == 304:
+            self.reply(304, headers={'ETag': server.etag()})
+        elif status == 404:
+            self.reply(404)
+        else:
+            body = json.dumps(server.ranking(int(query.get('page', 1)), int(query.get('per_page', 100)))).encode()
+            self.reply(200, body, {'Content-Type': 'application/json', 'ETag': server.etag()})
+
+def run_checks(gd, coin_count: int = 600) -> dict:
+    """Put a CoinRankingScout through paging, pooling, revalidation, throttling and outages"""
+    server = CoinGeckoStandIn(coin_count).start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, 'coingecko_rankings.json')
+            scout = gd.CoinRankingScout(server.base_url, cache_path)
+            pages = -(-coin_count // scout.PER_PAGE)
+
+            # Paging past 250, one page per request, all over one pooled connection
+            coins = scout.top_coins(coin_count)
+            assert [coin['symbol'] for coin in coins] == [f"c{rank}" for rank in range(1, coin_count + 1)], \
+                "ranking came back out of order or incomplete"
+            assert [request['page'] for request in server.requests] == list(range(1, pages + 1))
+            assert len({request['port'] for request in server.requests}) == 1, "pages didn't share a connection"
+            results['paging'] = f"{len(coins)} coins over {pages} pages, 1 connection"
+
+            # Fresh pages come straight off disk
+            served = len(server.requests)
+            assert scout.top_coins(coin_count) == coins and len(server.requests) == served
+            results['fresh_cache'] = "no requests within the ttl"
+
+            # Expired pages are revalidated; an unchanged ranking is a 304 per page
+            revalidating = gd.CoinRankingScout(server.base_url, cache_path, ttl=0)
+            assert revalidating.top_coins(coin_count) == coins
+            revalidated = server.requests[served:]
+            assert [request['status'] for request in revalidated] == [304] * pages
+            assert all(request['if_none_match'] == server.etag() for request in revalidated)
+            server.version += 1
+            assert revalidating.top_coins(coin_count) == coins
+            assert server.statuses()[-pages:] == [200] * pages
+            results['revalidation'] = f"{pages} x 304 while unchanged, 200s once the ETag moved"
+
+            # A 429 is retried rather than failing the discovery
+            server.throttle = 2
+            assert revalidating.top_coins(scout.PER_PAGE) == coins[:scout.PER_PAGE]
+            assert server.statuses()[-3:] == [429, 429, 304]
+            results['throttling'] = "2 x 429 retried, then revalidated"
+
+            # With CoinGecko down, stale pages beat no ranking at all
+            server.down = True
+            assert revalidating.top_coins(coin_count) == coins and revalidating.stale_pages == pages
+            uncached = gd.CoinRankingScout(server.base_url, None, ttl=0)
+            try:
+                uncached.top_coins(coin_count)
+                raise AssertionError("an outage without a cache should raise")
+            except requests.RequestException:
+                pass
+            results['stale_fallback'] = f"{pages} stale pages served while down; no cache raises"
+    finally:
+        server.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CoinRankingScout against a local CoinGecko stand-in")
+    parser.add_argument("--coins", type=int, default=600, help="size of the stand-in's ranking")
+    args = parser.parse_args()
+
+    gd = load_gold_digger()
+    for check, outcome in run_checks(gd, args.coins).items():
+        print(f"✅ {check}: {outcome}")
+
+if __name__ == "__main__":
+    main()
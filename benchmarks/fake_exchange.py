@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ccxt
+import numpy as np
+
+HOUR_MS = 60 * 60 * 1000
+
+def synthetic_ohlcv(n: int, start_ms: int, timeframe_ms: int = HOUR_MS, seed: int = 7,
+                    spike_rate: float = 0.03) -> Tuple[np.ndarray, np.ndarray]:
+    """Random-walk candles with volume breakouts, as (timestamps, open/high/low/close/volume)
+
+    Volume is lognormal; a spike_rate share of candles break out with 2-8x the
+    usual volume, fading over the next two candles, and move the price with them.
+    Volatility scales with the square root of the candle size.
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01 * np.sqrt(timeframe_ms / HOUR_MS), n)
+    volume = rng.lognormal(3, 0.5, n)
+
+    spikes = np.flatnonzero(rng.random(n) < spike_rate)
+    multipliers = rng.uniform(2, 8, len(spikes))
+    for lag, fade in enumerate((1.0, 0.4, 0.15)):
+        volume[np.minimum(spikes + lag, n - 1)] *= 1 + (multipliers - 1) * fade
+    returns[spikes] += rng.normal(0, 0.02, len(spikes))
+
+    close = 100 * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.003, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.003, n)))
+    timestamps = start_ms + np.arange(n, dtype=np.int64) * timeframe_ms
+    return timestamps, np.column_stack([open_, high, low, close, volume])
+
+class FakeExchange:
+    """Offline drop-in for a ccxt exchange in GoldDigger.exchanges 🎭
+
+    Every (symbol, timeframe) is a seeded synthetic_ohlcv series reaching
+    history_days back from when the exchange was created, so repeated runs see
+    the same candles. Candles appear as clock() passes their open time, the
+    last one still forming, like on a live exchange. Every call sleeps latency
+    seconds in place of the network round trip; page_limit caps the candles
+    one fetch_ohlcv returns (None for no cap).
+    """
+
+    def __init__(self, symbols: List[str], exchange_id: str = 'kraken', history_days: int = 30,
+                 latency: float = 0.0, page_limit: Optional[int] = None,
+                 clock: Callable[[], float] = time.time, seed: int = 7):
+        self.id = exchange_id
+        self.symbols = list(symbols)
+        self.history_days = history_days
+        self.latency = latency
+        self.page_limit = page_limit
+        self.clock = clock
+        self.seed = seed
+        self.created_ms = int(clock() * 1000)
+        self.apiKey = self.secret = self.password = None
+        self.rateLimit = 0
+        self.enableRateLimit = False
+        self.markets = {}
+        self.currencies = {}
+        self.features = {'spot': {'fetchOHLCV': {'limit': page_limit}}} if page_limit else {}
+        self.calls = {}
+        self.series = {}
+        self.lock = threading.Lock()
+
+    parse_timeframe = staticmethod(ccxt.Exchange.parse_timeframe)
+
+    def milliseconds(self) -> int:
+        return int(self.clock() * 1000)
+
+    def count_call(self, method: str):
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def candles(self, symbol: str, timeframe: str) -> Tuple[np.ndarray, np.ndarray]:
+        """The symbol's series, generated on first use - with a day to spare past creation"""
+        with self.lock:
+            if (symbol, timeframe) not in self.series:
+                timeframe_ms = self.parse_timeframe(timeframe) * 1000
+                first_ms = (self.created_ms - self.history_days * 24 * HOUR_MS) // timeframe_ms * timeframe_ms
+                n = (self.history_days + 1) * 24 * HOUR_MS // timeframe_ms
+                seed = zlib.crc32(f"{symbol}|{timeframe}".encode()) ^ self.seed
+                self.series[symbol, timeframe] = synthetic_ohlcv(n, first_ms, timeframe_ms, seed)
+            return self.series[symbol, timeframe]
+
+    def last_open_ms(self, timeframe: str) -> int:
+        """Open time of the newest candle on offer - the one still forming"""
+        return self.milliseconds()
+
+    def listing(self) -> Dict[str, Dict]:
+        return {symbol: {'id': symbol.replace('/', ''), 'symbol': symbol, 'base': symbol.split('/')[0],
+                         'quote': symbol.split('/')[1], 'spot': True, 'active': True}
+                for symbol in self.symbols}
+
+    def serve_ohlcv(self, symbol: str, timeframe: str, since: Optional[int], limit: Optional[int]) -> List[List]:
+        if symbol not in self.symbols:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        timestamps, values = self.candles(symbol, timeframe)
+        end = int(np.searchsorted(timestamps, self.last_open_ms(timeframe), side='right'))
+        count = min(limit or self.page_limit or end, self.page_limit or end)
+        # Without since an exchange answers with its most recent candles
+        start = int(np.searchsorted(timestamps, since)) if since is not None else max(0, end - count)
+        stop = min(start + count, end)
+        return [[int(timestamp), *row] for timestamp, row in zip(timestamps[start:stop], values[start:stop].tolist())]
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: Optional[int] = None,
+                    limit: Optional[int] = None, params: Optional[Dict] = None) -> List[List]:
+        self.count_call('fetch_ohlcv')
+        time.sleep(self.latency)
+        return self.serve_ohlcv(symbol, timeframe, since, limit)
+
+    def load_markets(self, reload: bool = False, params: Optional[Dict] = None) -> Dict[str, Dict]:
+        self.count_call('load_markets')
+        time.sleep(self.latency)
+        self.markets = self.listing()
+        return self.markets
+
+    def set_markets(self, markets: Dict, currencies: Optional[Dict] = None):
+        self.markets = markets
+        self.currencies = currencies or {}
+
+    def async_twin(self) -> 'FakeAsyncExchange':
+        """The same exchange for the async mining rigs, sharing its candles and call counts"""
+        twin = FakeAsyncExchange.__new__(FakeAsyncExchange)
+        twin.__dict__.update(self.__dict__)
+        twin.markets = {}
+        return twin
+
+class FakeAsyncExchange(FakeExchange):
+    """Async twin of FakeExchange, like a ccxt.async_support rig"""
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: Optional[int] = None,
+                          limit: Optional[int] = None, params: Optional[Dict] = None) -> List[List]:
+        self.count_call('fetch_ohlcv')
+        await asyncio.sleep(self.latency)
+        return self.serve_ohlcv(symbol, timeframe, since, limit)
+
+    async def load_markets(self, reload: bool = False, params: Optional[Dict] = None) -> Dict[str, Dict]:
+        self.count_call('load_markets')
+        await asyncio.sleep(self.latency)
+        self.markets = self.listing()
+        return self.markets
+
+    async def close(self):
+        pass
+
+class FakeCoinRanking:
+    """Stands in for GoldDigger.coin_scout, ranking the fake exchange's symbols in order"""
+
+    def __init__(self, symbols: List[str]):
+        self.symbols = list(symbols)
+        self.stale_pages = 0
+
+    def top_coins(self, limit: int = 100) -> List[Dict]:
+        return [{'symbol': symbol.split('/')[0].lower(), 'market_cap_rank': rank}
+                for rank, symbol in enumerate(self.symbols[:limit], 1)]
+
+def plug_in(digger, exchange: FakeExchange, rate_limited: bool = False):
+    """Point a GoldDigger at the fake exchange (and a matching coin ranking)
+
+    Unless rate_limited, the exchange gets an unlimited request budget, so runs
+    measure the digger rather than the rate limiter.
+    """
+    digger.exchanges = {exchange.id: exchange}
+    digger.coin_scout = FakeCoinRanking(exchange.symbols)
+    digger.summon_async_mining_rigs = lambda: {exchange.id: exchange.async_twin()}
+    if not rate_limited:
+        digger.rate_limiter.budgets[exchange.id] = (1_000_000, 1)
@@ -0,0 +1,229 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import schedule
+
+from bench_ml_features import load_gold_digger
+from fake_exchange import FakeCoinRanking, FakeExchange
+
+# Columns SQLite stamps with its own (real) clock; left out of vault fingerprints
+STAMPED_COLUMNS = {'created_at', 'updated_at', ('mining_performance', 'timestamp')}
+
+class VirtualClock:
+    """Simulated wall clock for a replay - it only moves when something sleeps ⏩"""
+
+    def __init__(self, start: float):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    monotonic = perf_counter = time
+
+    def sleep(self, seconds: float):
+        self.now += max(0.0, seconds)
+
+    def datetime_class(self) -> type:
+        """A datetime whose now() reads this clock"""
+        clock = self
+
+        class VirtualDatetime(datetime.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.datetime.fromtimestamp(clock.now, tz)
+
+        return VirtualDatetime
+
+class ModuleView:
+    """A module with some attributes swapped out"""
+
+    def __init__(self, module, **overrides):
+        self.module = module
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+class ReplayExchange(FakeExchange):
+    """FakeExchange serving the candles recorded in a raw candle cache, as they close on the virtual clock
+
+    Only closed candles are ever recorded, so unlike the live exchange no
+    half-built candle is on offer.
+    """
+
+    def __init__(self, store, exchange_id: str, clock: VirtualClock):
+        symbols = list(dict.fromkeys(symbol for name, symbol, _ in store.list_series() if name == exchange_id))
+        super().__init__(symbols, exchange_id, clock=clock.time)
+        self.store = store
+
+    def candles(self, symbol: str, timeframe: str):
+        with self.lock:
+            if (symbol, timeframe) not in self.series:
+                rows = np.asarray(self.store.load(self.id, symbol, timeframe), dtype='float64').reshape(-1, 6)
+                self.series[symbol, timeframe] = rows[:, 0].astype('int64'), rows[:, 1:]
+            return self.series[symbol, timeframe]
+
+    def last_open_ms(self, timeframe: str) -> int:
+        return self.milliseconds() - self.parse_timeframe(timeframe) * 1000
+
+def install_clock(gd, clock: VirtualClock):
+    """Put gold-digger.py and the scheduler on the virtual clock; returns what to restore"""
+    saved = (gd.time, gd.datetime, schedule.datetime)
+    virtual_datetime = clock.datetime_class()
+    gd.time = ModuleView(time, time=clock.time, sleep=clock.sleep, monotonic=clock.monotonic,
+                         perf_counter=clock.perf_counter)
+    gd.datetime = virtual_datetime
+    schedule.datetime = ModuleView(datetime, datetime=virtual_datetime)
+    return saved
+
+def restore_clock(gd, saved):
+    gd.time, gd.datetime, schedule.datetime = saved
+
+def vault_fingerprint(db_path: str) -> str:
+    """SHA-256 over every vault table's rows, leaving out the SQLite-stamped columns"""
+    digest = hashlib.sha256()
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        for table in tables:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')
+                       if row[1] not in STAMPED_COLUMNS and (table, row[1]) not in STAMPED_COLUMNS]
+            digest.update(f"{table}({','.join(columns)})".encode())
+            for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid"):
+                digest.update(repr(row).encode())
+    finally:
+        conn.close()
+    return digest.hexdigest()
+
+def replay(gd, store_dir: str, work_dir: str, start: float = None, until: float = None,
+           symbols: list = None, seed: int = 0, verbose: bool = False, force: bool = False) -> dict:
+    """Replay main()'s schedule over the recorded candles, as fast as the CPU allows 🔁
+
+    The virtual clock starts when the recorded history is 30 days deep (or at
+    start) and runs until the last recorded candle has closed (or until). The
+    digger mines into a fresh vault under work_dir with its own candle and
+    market caches, just like a new deployment would. A work_dir with anything
+    in it is refused, unless force clears it first.
+    """
+    if os.path.isdir(work_dir) and os.listdir(work_dir):
+        if not force:
+            raise FileExistsError(f"{work_dir} is not empty - a replay starts from a fresh vault (force clears it)")
+        shutil.rmtree(work_dir)
+    store = gd.RawCandleCache(store_dir)
+    timeframe_ms = gd.ccxt.Exchange.parse_timeframe('1h') * 1000
+    coverage = [store.coverage(*series) for series in store.list_series('1h')]
+    coverage = [span for span in coverage if span is not None]
+    if not coverage:
+        raise ValueError(f"No 1h candles recorded in {store_dir}")
+    start = start if start is not None else min(first for first, _ in coverage) / 1000 + 30 * 24 * 60 * 60
+    until = until if until is not None else (max(last for _, last in coverage) + timeframe_ms) / 1000
+
+    clock = VirtualClock(start)
+    saved = install_clock(gd, clock)
+    try:
+        random.seed(seed)
+        np.random.seed(seed)
+        os.makedirs(work_dir)
+        db_path = os.path.join(work_dir, "gold_digger_vault.db")
+        digger = gd.GoldDigger(db_path, candle_cache_dir=os.path.join(work_dir, "gold_digger_candles"),
+                               market_cache_dir=os.path.join(work_dir, "gold_digger_markets"), metrics_path=None)
+        if not verbose:
+            digger.log_funny = lambda message, level="info": None
+        digger.exchanges = {name: ReplayExchange(store, name, clock) for name in gd.MINING_ROUTE
+                            if any(series[0] == name for series in store.list_series('1h'))}
+        ranking = symbols or list(dict.fromkeys(symbol for exchange in digger.exchanges.values()
+                                                for symbol in exchange.symbols if symbol.endswith('/USDT')))
+        digger.coin_scout = FakeCoinRanking(ranking)
+
+        expeditions = []
+        scheduler = schedule.Scheduler()
+
+        def timed(run, *args):
+            virtual_start = clock.time()
+            metrics_start = digger.metrics.snapshot()
+            real_start = time.perf_counter()
+            run(*args)
+            expeditions.append({
+                'virtual_time': pd.Timestamp(virtual_start, unit='s').isoformat(),
+                'real_seconds': time.perf_counter() - real_start,
+                'rows_written': digger.metrics.report(metrics_start)['rows_written'],
+            })
+
+        replay_start = time.perf_counter()
+        timed(gd.start_mining_schedule, digger, scheduler)
+        # The same poll loop as main(), minus the waiting
+        while True:
+            if scheduler.idle_seconds is not None and scheduler.idle_seconds <= 0:
+                timed(scheduler.run_pending)
+            if clock.time() >= until:
+                break
+            clock.sleep(gd.SCHEDULE_POLL_SECONDS)
+        real_seconds = time.perf_counter() - replay_start
+        digger.close()
+    finally:
+        restore_clock(gd, saved)
+
+    virtual_seconds = clock.time() - start
+    return {
+        'store': store_dir,
+        'vault': db_path,
+        'start': pd.Timestamp(start, unit='s').isoformat(),
+        'until': pd.Timestamp(clock.time(), unit='s').isoformat(),
+        'virtual_hours': virtual_seconds / 3600,
+        'real_seconds': real_seconds,
+        'speedup': virtual_seconds / real_seconds if real_seconds else 0.0,
+        'expeditions': expeditions,
+        'fingerprint': vault_fingerprint(db_path),
+    }
+
+def parse_time(value: str) -> float:
+    return pd.Timestamp(value, tz='UTC').timestamp()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Gold-Digger's schedule over recorded candles on a virtual clock")
+    parser.add_argument("store", help="raw candle cache recorded by a live digger (e.g. gold_digger_candles)")
+    parser.add_argument("--work-dir", default="replay_run", help="where the replayed vault and caches go")
+    parser.add_argument("--start", type=parse_time, default=None, help="virtual start time (UTC)")
+    parser.add_argument("--until", type=parse_time, default=None, help="virtual end time (UTC)")
+    parser.add_argument("--symbols", nargs="+", default=None, help="coin ranking to replay, best first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true", help="replay twice and check the vaults are identical")
+    parser.add_argument("--verbose", action="store_true", help="keep the digger's log output")
+    parser.add_argument("--force", action="store_true", help="clear the work dir (and its _verify twin) first")
+    parser.add_argument("--out", default=None, help="save the replay summary as JSON")
+    args = parser.parse_args()
+
+    for work_dir in [args.work_dir] + ([args.work_dir + "_verify"] if args.verify else []):
+        if os.path.isdir(work_dir) and os.listdir(work_dir) and not args.force:
+            parser.error(f"{work_dir} is not empty - pass --force to clear it and replay from a fresh vault")
+
+    gd = load_gold_digger()
+    summary = replay(gd, args.store, args.work_dir, args.start, args.until, args.symbols, args.seed, args.verbose,
+                     args.force)
+    print(f"🔁 Replayed {summary['virtual_hours']:,.1f} virtual hours ({len(summary['expeditions'])} expeditions) "
+          f"in {summary['real_seconds']:,.1f}s - {summary['speedup']:,.0f}x real time")
+    print(f"🔑 Vault fingerprint: {summary['fingerprint']}")
+
+    if args.verify:
+        again = replay(gd, args.store, args.work_dir + "_verify", args.start, args.until, args.symbols, args.seed,
+                       force=args.force)
+        summary['deterministic'] = again['fingerprint'] == summary['fingerprint']
+        print(f"🎯 Second replay {'matches' if summary['deterministic'] else 'DIFFERS'}: {again['fingerprint']}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as out_file:
+            json.dump(summary, out_file, indent=2)
+        print(f"💾 Summary saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+import ccxt
+import ccxt.pro as ccxt_pro
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from bench_ml_features import load_gold_digger
+from fake_exchange import HOUR_MS, FakeExchange, plug_in
+
+# Rows compared between the streamed vault and the REST-mined reference vault
+COMPARED_COLUMNS = {
+    'gold_nuggets': ['price', 'volume', 'volume_breakout_score', 'rsi', 'macd', 'bb_position'],
+    'volume_jackpots': ['volume_multiplier', 'price_impact_1h', 'confidence_score'],
+}
+
+def synthetic_trades(symbol: str, timestamps: np.ndarray, values: np.ndarray, timeframe_ms: int = HOUR_MS,
+                     per_candle: int = 30, seed: int = 7) -> List[List]:
+    """Trades adding up to the given candles exactly, as [symbol, timestamp_ms, price, amount] rows
+
+    Each candle's first trade is at its open and its last at its close, both
+    extremes are hit in between, and the amounts split its volume.
+    """
+    rng = np.random.default_rng(seed)
+    trades = []
+    for timestamp, (open_, high, low, close, volume) in zip(timestamps, values):
+        times = timestamp + np.sort(rng.integers(0, timeframe_ms, per_candle))
+        prices = rng.uniform(low, high, per_candle)
+        prices[0], prices[-1] = open_, close
+        extremes = rng.choice(np.arange(1, per_candle - 1), 2, replace=False)
+        prices[extremes] = high, low
+        amounts = rng.dirichlet(np.ones(per_candle)) * volume
+        trades += [[symbol, int(t), float(p), float(a)] for t, p, a in zip(times, prices, amounts)]
+    return trades
+
+def load_trades(path: str) -> List[List]:
+    """Trades recorded by `record`, one JSON [symbol, timestamp_ms, price, amount] per line"""
+    with open(path, encoding='utf-8') as trade_file:
+        return [json.loads(line) for line in trade_file if line.strip()]
+
+class RecordedExchange(FakeExchange):
+    """FakeExchange serving the candles the recorded trades add up to - the REST side of a recorded replay"""
+
+    def __init__(self, trades: List[List], exchange_id: str, timeframe: str, clock):
+        super().__init__(sorted({trade[0] for trade in trades}), exchange_id, clock=clock)
+        timeframe_ms = self.parse_timeframe(timeframe) * 1000
+        frame = pd.DataFrame(trades, columns=['symbol', 'timestamp', 'price', 'amount'])
+        frame = frame.sort_values('timestamp', kind='stable')
+        frame['bucket'] = frame['timestamp'] // timeframe_ms * timeframe_ms
+        candles = frame.groupby(['symbol', 'bucket']).agg(
+            open=('price', 'first'), high=('price', 'max'), low=('price', 'min'),
+            close=('price', 'last'), volume=('amount', 'sum'))
+        for symbol, rows in candles.groupby(level=0):
+            self.series[symbol, timeframe] = rows.index.get_level_values(1).to_numpy('int64'), rows.to_numpy()
+
+    def candles(self, symbol: str, timeframe: str):
+        with self.lock:
+            return self.series.get((symbol, timeframe), (np.empty(0, dtype='int64'), np.empty((0, 5))))
+
+class TradeReplayServer:
+    """Local websocket stand-in for an exchange trade feed, replaying trades on a fast-forward clock 📼
+
+    Every tick the clock moves speed * tick_seconds ahead and each client gets
+    the trades of its subscribed symbols up to the new time, with the clock.
+    A client that connects late or reconnects misses what was sent meanwhile,
+    like on a live feed; drop_at_ms cuts every connection once the clock passes it.
+    """
+
+    def __init__(self, trades: List[List], start_ms: int, end_ms: int, speed: float = 3600.0,
+                 tick_seconds: float = 0.01, drop_at_ms: Optional[int] = None, host: str = '127.0.0.1'):
+        self.trades = sorted(trades, key=lambda trade: trade[1])
+        self.timestamps = [trade[1] for trade in self.trades]
+        self.clock_ms = start_ms
+        self.end_ms = end_ms
+        self.speed = speed
+        self.tick_seconds = tick_seconds
+        self.drop_at_ms = drop_at_ms
+        self.host = host
+        self.clients = {}
+        self.connections = 0
+        self.replay_task = None
+        self.runner = None
+        self.finished = asyncio.Event()
+
+    def clock(self) -> float:
+        return self.clock_ms / 1000
+
+    async def start(self) -> str:
+        """Start listening on a free local port; returns the websocket URL"""
+        app = web.Application()
+        app.router.add_get('/ws', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.host, 0))
+        await web.SockSite(self.runner, sock).start()
+        return f"ws://{self.host}:{sock.getsockname()[1]}/ws"
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients[ws] = set()
+        self.connections += 1
+        if self.replay_task is None:
+            self.replay_task = asyncio.ensure_future(self.replay())
+        try:
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    request_body = json.loads(message.data)
+                    if request_body.get('op') == 'subscribe':
+                        self.clients[ws].update(request_body['symbols'])
+        finally:
+            self.clients.pop(ws, None)
+        return ws
+
+    async def replay(self):
+        sent = 0
+        while self.clock_ms < self.end_ms:
+            await asyncio.sleep(self.tick_seconds)
+            self.clock_ms = min(self.end_ms, self.clock_ms + int(self.speed * self.tick_seconds * 1000))
+            until = bisect.bisect_right(self.timestamps, self.clock_ms)
+            batch, sent = self.trades[sent:until], until
+            for ws, symbols in list(self.clients.items()):
+                try:
+                    await ws.send_json({'clock': self.clock_ms,
+                                        'trades': [trade for trade in batch if trade[0] in symbols]})
+                except ConnectionError:
+                    self.clients.pop(ws, None)
+            if self.drop_at_ms is not None and self.clock_ms >= self.drop_at_ms:
+                self.drop_at_ms = None
+                await asyncio.gather(*(ws.close() for ws in list(self.clients)), return_exceptions=True)
+        self.finished.set()
+
+    async def stop(self):
+        if self.replay_task is not None:
+            self.replay_task.cancel()
+        await asyncio.gather(*(ws.close() for ws in list(self.clients)), return_exceptions=True)
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+class StandInTradeRig:
+    """The slice of a ccxt.pro client stream_gold uses, talking to a TradeReplayServer 🔌
+
+    watch_trades returns the trades received since the last call, waiting for
+    some if there are none, and raises NetworkError once per symbol when the
+    connection drops; the next call reconnects. milliseconds() is the replay clock.
+    """
+
+    def __init__(self, url: str, exchange_id: str = 'kraken', start_ms: int = 0):
+        self.url = url
+        self.id = exchange_id
+        self.clock_ms = start_ms
+        self.markets = {}
+        self.currencies = {}
+        self.session = None
+        self.ws = None
+        self.lock = None
+        self.subscribed = set()
+        self.buffers = {}
+        self.updates = {}
+        self.errors = {}
+
+    def milliseconds(self) -> int:
+        return self.clock_ms
+
+    def set_markets(self, markets: Dict, currencies: Optional[Dict] = None):
+        self.markets = markets
+        self.currencies = currencies or {}
+
+    async def connect(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        try:
+            self.ws = await self.session.ws_connect(self.url)
+        except aiohttp.ClientError as e:
+            raise ccxt.NetworkError(f"{self.url} unreachable: {e}") from e
+        await self.ws.send_json({'op': 'subscribe', 'symbols': sorted(self.subscribed)})
+        asyncio.ensure_future(self.read(self.ws))
+
+    async def read(self, ws):
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                break
+            update = json.loads(message.data)
+            self.clock_ms = update['clock']
+            for symbol, timestamp, price, amount in update['trades']:
+                self.buffers.setdefault(symbol, []).append({
+                    'symbol': symbol, 'timestamp': timestamp, 'price': price, 'amount': amount,
+                    'datetime': pd.Timestamp(timestamp, unit='ms').isoformat(),
+                })
+                self.updates.setdefault(symbol, asyncio.Event()).set()
+        if self.ws is ws:
+            self.ws = None
+            for symbol in self.subscribed:
+                self.errors[symbol] = ccxt.NetworkError(f"{self.url} closed the connection")
+                self.updates.setdefault(symbol, asyncio.Event()).set()
+
+    async def watch_trades(self, symbol: str, since: Optional[int] = None, limit: Optional[int] = None,
+                           params: Optional[Dict] = None) -> List[Dict]:
+        self.lock = self.lock or asyncio.Lock()
+        async with self.lock:
+            if symbol not in self.subscribed:
+                self.subscribed.add(symbol)
+                if self.ws is not None:
+                    await self.ws.send_json({'op': 'subscribe', 'symbols': [symbol]})
+            if self.ws is None and symbol not in self.errors:
+                await self.connect()
+        update = self.updates.setdefault(symbol, asyncio.Event())
+        while not self.buffers.get(symbol):
+            if symbol in self.errors:
+                raise self.errors.pop(symbol)
+            update.clear()
+            await update.wait()
+        trades, self.buffers[symbol] = self.buffers[symbol], []
+        return trades
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self.session is not None:
+            await self.session.close()
+
+def mine_reference_vault(gd, exchange: FakeExchange, symbols: List[str], db_path: str, start_ms: int,
+                         end_ms: int, timeframe: str, catch_up_days: int):
+    """Mine the replay window the REST way - an incremental dig of every symbol after every candle close"""
+    digger = gd.GoldDigger(db_path, candle_cache_dir=None, market_cache_dir=None, metrics_path=None)
+    digger.log_funny = lambda message, level="info": None
+    plug_in(digger, exchange)
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    clock = exchange.clock
+    try:
+        # Catch up at the start, then dig as each candle closes
+        first_close_ms = start_ms // timeframe_ms * timeframe_ms + timeframe_ms
+        for close_ms in [start_ms, *range(first_close_ms, end_ms + 1, timeframe_ms)]:
+            exchange.clock = lambda: (close_ms + gd.STREAM_GRACE_MS) / 1000
+            for symbol in symbols:
+                digger.dig_streamed_gap(exchange.id, symbol, timeframe, catch_up_days)
+    finally:
+        exchange.clock = clock
+        digger.close()
+
+def compare_vaults(streamed_path: str, reference_path: str, since: str) -> Dict:
+    """Rows of the compared tables from since on, matched by (symbol, timestamp), values to within rounding"""
+    comparison = {}
+    for table, columns in COMPARED_COLUMNS.items():
+        frames = []
+        for path in (streamed_path, reference_path):
+            conn = sqlite3.connect(path)
+            try:
+                frames.append(pd.read_sql_query(
+                    f"SELECT symbol, timestamp, {', '.join(columns)} FROM {table} WHERE timestamp >= ? "
+                    "ORDER BY symbol, timestamp", conn, params=[since]))
+            finally:
+                conn.close()
+        streamed, reference = frames
+        same_rows = streamed[['symbol', 'timestamp']].equals(reference[['symbol', 'timestamp']])
+        values_match = same_rows and np.allclose(streamed[columns].to_numpy(dtype='float64'),
+                                                 reference[columns].to_numpy(dtype='float64'),
+                                                 rtol=1e-6, atol=1e-9, equal_nan=True)
+        comparison[table] = {'streamed': len(streamed), 'reference': len(reference), 'match': bool(values_match)}
+    return comparison
+
+async def stream_replay(gd, trades: List[List], exchange: FakeExchange, work_dir: str, start_ms: int,
+                        end_ms: int, timeframe: str, catch_up_days: int, speed: float,
+                        drop_at_ms: Optional[int], drain_seconds: float) -> Dict:
+    """Run stream_gold against the stand-in, mining into a fresh vault under work_dir"""
+    server = TradeReplayServer(trades, start_ms, end_ms + 60_000, speed, drop_at_ms=drop_at_ms)
+    url = await server.start()
+    exchange.clock = server.clock
+
+    digger = gd.GoldDigger(os.path.join(work_dir, "gold_digger_vault.db"),
+                           candle_cache_dir=os.path.join(work_dir, "gold_digger_candles"),
+                           market_cache_dir=None, metrics_path=None)
+    digger.log_funny = lambda message, level="info": None
+    plug_in(digger, exchange)
+    digger.stream_rigs = {exchange.id: StandInTradeRig(url, exchange.id, start_ms)}
+    symbols = list(exchange.symbols)
+
+    jackpots = []
+    replay_seconds = (end_ms + 60_000 - start_ms) / 1000 / speed
+    started = time.perf_counter()
+    try:
+        counters = await digger.stream_gold(symbols, exchange.id, timeframe, catch_up_days,
+                                            duration=replay_seconds + drain_seconds, on_jackpot=jackpots.append)
+    finally:
+        await server.stop()
+    report = digger.metrics.report()
+    digger.close()
+
+    return {
+        'url': url,
+        'symbols': len(symbols),
+        'trades_replayed': len(trades),
+        'connections': server.connections,
+        'real_seconds': time.perf_counter() - started,
+        'counters': counters,
+        'jackpots': [{**jackpot, 'timestamp': str(jackpot['timestamp'])} for jackpot in jackpots],
+        'close_to_vault_ms': report['stages'].get('stream'),
+    }
+
+def replay_main(args):
+    gd = load_gold_digger()
+    if args.retry_seconds is not None:
+        gd.STREAM_RETRY_SECONDS = args.retry_seconds
+    timeframe_ms = ccxt.Exchange.parse_timeframe(args.timeframe) * 1000
+
+    if args.trades:
+        trades = load_trades(args.trades)
+        start_ms = min(trade[1] for trade in trades)
+        end_ms = max(trade[1] for trade in trades) // timeframe_ms * timeframe_ms + timeframe_ms
+        exchange = RecordedExchange(trades, args.exchange, args.timeframe, clock=lambda: start_ms / 1000)
+    else:
+        if args.hours > 24:
+            raise SystemExit("--hours: synthetic replays cover at most 24 hours")
+        # Replay a window that has closed on the real clock too, as recorded trades would be
+        end_ms = int(time.time() * 1000) // timeframe_ms * timeframe_ms - timeframe_ms
+        start_ms = end_ms - args.hours * HOUR_MS
+        symbols = [f"C{i:04d}/USDT" for i in range(args.symbols)]
+        # History stays inside the catch-up window, so every catch-up dig gets all of it whatever its clock says
+        exchange = FakeExchange(symbols, args.exchange, history_days=max(1, args.catch_up_days - 1),
+                                clock=lambda: start_ms / 1000)
+        trades = []
+        for symbol in symbols:
+            timestamps, values = exchange.candles(symbol, args.timeframe)
+            window = (timestamps >= start_ms) & (timestamps < end_ms)
+            trades += synthetic_trades(symbol, timestamps[window], values[window], timeframe_ms,
+                                       args.trades_per_candle, seed=args.seed)
+
+    drop_at_ms = start_ms + int(args.drop_at_hour * HOUR_MS) if args.drop_at_hour is not None else None
+    streamed_dir = os.path.join(args.work_dir, "streamed")
+    shutil.rmtree(streamed_dir, ignore_errors=True)
+    os.makedirs(streamed_dir)
+    summary = asyncio.run(stream_replay(gd, trades, exchange, streamed_dir, start_ms,
+                                        end_ms, args.timeframe, args.catch_up_days, args.speed, drop_at_ms,
+                                        args.drain_seconds))
+    counters = summary['counters']
+    print(f"📼 Replayed {len(trades):,} trades for {summary['symbols']} symbols in {summary['real_seconds']:.1f}s "
+          f"over {summary['connections']} connection(s)")
+    print(f"🕯️ {counters['candles']} candles built from trades, {counters['dug_candles']} dug over REST, "
+          f"{counters['jackpots']} jackpots (+{counters['caught_up_jackpots']} caught up), "
+          f"{counters['late_trades']} late trades")
+    if summary['close_to_vault_ms']:
+        latency = summary['close_to_vault_ms']
+        print(f"⏱️ Candle close to vault: p50 {latency['p50_ms']:.0f}ms, p95 {latency['p95_ms']:.0f}ms")
+
+    if args.verify:
+        reference_path = os.path.join(args.work_dir, "reference_vault.db")
+        if os.path.exists(reference_path):
+            os.remove(reference_path)
+        mine_reference_vault(gd, exchange, list(exchange.symbols), reference_path, start_ms, end_ms,
+                             args.timeframe, args.catch_up_days)
+        since = str(pd.Timestamp(start_ms, unit='ms'))
+        summary['verify'] = compare_vaults(os.path.join(streamed_dir, "gold_digger_vault.db"),
+                                           reference_path, since)
+        for table, outcome in summary['verify'].items():
+            print(f"🎯 {table}: {outcome['streamed']} streamed vs {outcome['reference']} REST-mined rows - "
+                  f"{'match' if outcome['match'] else 'DIFFER'}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as out_file:
+            json.dump(summary, out_file, indent=2)
+        print(f"💾 Summary saved to {args.out}")
+
+    differing = [table for table, outcome in summary.get('verify', {}).items() if not outcome['match']]
+    if differing:
+        raise SystemExit(f"💥 Streamed vault differs from the REST-mined one in {', '.join(differing)}")
+
+async def record_trades(exchange_id: str, symbols: List[str], out_path: str, minutes: float) -> int:
+    """Record a live trade feed through ccxt.pro for the replay server"""
+    rig = getattr(ccxt_pro, exchange_id)()
+    deadline = time.time() + minutes * 60
+    recorded = 0
+    with open(out_path, 'w', encoding='utf-8') as trade_file:
+        async def watch(symbol: str):
+            nonlocal recorded
+            while time.time() < deadline:
+                try:
+                    trades = await asyncio.wait_for(rig.watch_trades(symbol), deadline - time.time())
+                except asyncio.TimeoutError:
+                    break
+                for trade in trades:
+                    trade_file.write(json.dumps([symbol, trade['timestamp'], trade['price'], trade['amount']]) + '\n')
+                recorded += len(trades)
+
+        try:
+            await asyncio.gather(*(watch(symbol) for symbol in symbols))
+        finally:
+            await rig.close()
+    return recorded
+
+def record_main(args):
+    recorded = asyncio.run(record_trades(args.exchange, args.symbols, args.out, args.minutes))
+    print(f"💾 Recorded {recorded:,} {args.exchange} trades to {args.out}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay trades to Gold-Digger's live stream through a local websocket")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay = commands.add_parser("replay", help="stream recorded or synthetic trades into a fresh vault")
+    replay.add_argument("--trades", default=None, help="trades recorded with `record` (default: synthetic trades)")
+    replay.add_argument("--exchange", default="kraken")
+    replay.add_argument("--symbols", type=int, default=5, help="synthetic symbols")
+    replay.add_argument("--hours", type=int, default=12, help="synthetic replay window (at most 24)")
+    replay.add_argument("--trades-per-candle", type=int, default=30)
+    replay.add_argument("--timeframe", default="1h")
+    replay.add_argument("--catch-up-days", type=int, default=7, help="history the stream catches up over REST first")
+    replay.add_argument("--speed", type=float, default=3600.0, help="replay clock seconds per real second")
+    replay.add_argument("--drop-at-hour", type=float, default=None, help="cut the connection this far into the replay")
+    replay.add_argument("--retry-seconds", type=float, default=0.05, help="resubscribe pause (real seconds)")
+    replay.add_argument("--drain-seconds", type=float, default=10.0, help="time to finish scoring after the replay")
+    replay.add_argument("--seed", type=int, default=7)
+    replay.add_argument("--work-dir", default="stream_replay_run")
+    replay.add_argument("--verify", action="store_true", help="compare against the same window mined over REST")
+    replay.add_argument("--out", default=None, help="save the replay summary as JSON")
+    replay.set_defaults(run=replay_main)
+
+    record = commands.add_parser("record", help="record a live ccxt.pro trade feed for later replays")
+    record.add_argument("out")
+    record.add_argument("--exchange", default="kraken")
+    record.add_argument("--symbols", nargs="+", default=["BTC/USDT", "ETH/USDT"])
+    record.add_argument("--minutes", type=float, default=60.0)
+    record.set_defaults(run=record_main)
+
+    args = parser.parse_args()
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
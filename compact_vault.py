@@ -0,0 +1,45 @@
+import argparse
+import importlib.util
+import os
+
+def load_gold_digger():
+    """Import gold-digger.py (its dash keeps it from being imported by name)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gold-digger.py")
+    spec = importlib.util.spec_from_file_location("gold_digger", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def compact_gold_vault(db_path="gold_digger_vault.db", partitioned=False, vacuum=True):
+    """
+    Offline Vault Compaction for Gold-Digger Bot
+    Removes the duplicate rows overlapping digs piled up, adds the natural-key
+    unique indexes that make future stores upserts, and reclaims the disk space.
+    Stop any running Gold-Digger before compacting its vault.
+    """
+    try:
+        gold_digger = load_gold_digger()
+        digger = gold_digger.GoldDigger(db_path, candle_cache_dir=None, market_cache_dir=None,
+                                        partitioned=partitioned)
+        report = digger.compact_vault(vacuum=vacuum)
+
+        for table, removed in report['removed'].items():
+            print(f"🧹 {table}: {removed:,} duplicate rows removed")
+        print(f"💾 Vault size: {report['bytes_before'] / 1e6:,.1f} MB -> {report['bytes_after'] / 1e6:,.1f} MB "
+              f"({report['bytes_reclaimed'] / 1e6:,.1f} MB reclaimed)")
+        if report['idempotent_writes']:
+            print("🔑 Natural-key indexes in place - re-digging the same candles now updates rows instead of duplicating them")
+        else:
+            print("⚠️ Some duplicates could not be removed - natural-key indexes not created")
+        return report
+
+    except Exception as e:
+        print(f"💥 Vault compaction failed: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate and compact a Gold-Digger vault")
+    parser.add_argument("db_path", nargs="?", default="gold_digger_vault.db")
+    parser.add_argument("--partitioned", action="store_true", help="the vault was created with partitioned=True")
+    parser.add_argument("--no-vacuum", action="store_true", help="skip the VACUUM (no space is reclaimed)")
+    args = parser.parse_args()
+    compact_gold_vault(args.db_path, args.partitioned, not args.no_vacuum)
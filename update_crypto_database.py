@@ -13,34 +13,67 @@ def update_crypto_gold_database(db_path="gold_digger_vault.db", json_path="crypt
         # Connect to the Gold-Digger vault
         conn = sqlite3.connect(db_path)
 
+        # Gold-Digger keeps hourly/daily rollups up to date as it stores nuggets, so the last day
+        # is a handful of pre-aggregated rows; vaults from before the rollups get the full scan
+        has_rollups = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'nugget_rollups'"
+        ).fetchone()
+
         # Get latest data for top cryptos
-        query = """
-        SELECT
-            symbol,
-            AVG(price) as current_price,
-            SUM(volume) as volume_24h,
-            AVG(volume_breakout_score) as volume_breakout_score,
-            AVG(rsi) as rsi,
-            AVG(macd) as macd,
-            MAX(timestamp) as last_updated
-        FROM gold_nuggets
-        WHERE timestamp > date('now', '-1 day')
-        GROUP BY symbol
-        ORDER BY volume_24h DESC
-        LIMIT 10
-        """
+        if has_rollups:
+            query = """
+            SELECT
+                symbol,
+                SUM(price_sum) / SUM(nuggets) as current_price,
+                SUM(volume_sum) as volume_24h,
+                SUM(breakout_sum) / SUM(breakout_count) as volume_breakout_score,
+                SUM(rsi_sum) / SUM(rsi_count) as rsi,
+                SUM(macd_sum) / SUM(macd_count) as macd,
+                MAX(last_timestamp) as last_updated
+            FROM nugget_rollups
+            WHERE bucket = '1d' AND bucket_start > date('now', '-1 day')
+            GROUP BY symbol
+            ORDER BY volume_24h DESC
+            LIMIT 10
+            """
+        else:
+            query = """
+            SELECT
+                symbol,
+                AVG(price) as current_price,
+                SUM(volume) as volume_24h,
+                AVG(volume_breakout_score) as volume_breakout_score,
+                AVG(rsi) as rsi,
+                AVG(macd) as macd,
+                MAX(timestamp) as last_updated
+            FROM gold_nuggets
+            WHERE timestamp > date('now', '-1 day')
+            GROUP BY symbol
+            ORDER BY volume_24h DESC
+            LIMIT 10
+            """
 
         df = pd.read_sql_query(query, conn)
 
         # Get jackpot counts
-        jackpot_query = """
-        SELECT
-            COUNT(CASE WHEN jackpot_type = 'MEGA_JACKPOT' THEN 1 END) as mega_jackpots,
-            COUNT(CASE WHEN jackpot_type = 'BIG_JACKPOT' THEN 1 END) as big_jackpots,
-            COUNT(CASE WHEN jackpot_type = 'MINI_JACKPOT' THEN 1 END) as mini_jackpots
-        FROM volume_jackpots
-        WHERE timestamp > date('now', '-1 day')
-        """
+        if has_rollups:
+            jackpot_query = """
+            SELECT
+                COALESCE(SUM(CASE WHEN jackpot_type = 'MEGA_JACKPOT' THEN jackpots END), 0) as mega_jackpots,
+                COALESCE(SUM(CASE WHEN jackpot_type = 'BIG_JACKPOT' THEN jackpots END), 0) as big_jackpots,
+                COALESCE(SUM(CASE WHEN jackpot_type = 'MINI_JACKPOT' THEN jackpots END), 0) as mini_jackpots
+            FROM jackpot_rollups
+            WHERE bucket = '1d' AND bucket_start > date('now', '-1 day')
+            """
+        else:
+            jackpot_query = """
+            SELECT
+                COUNT(CASE WHEN jackpot_type = 'MEGA_JACKPOT' THEN 1 END) as mega_jackpots,
+                COUNT(CASE WHEN jackpot_type = 'BIG_JACKPOT' THEN 1 END) as big_jackpots,
+                COUNT(CASE WHEN jackpot_type = 'MINI_JACKPOT' THEN 1 END) as mini_jackpots
+            FROM volume_jackpots
+            WHERE timestamp > date('now', '-1 day')
+            """
         jackpot_stats = pd.read_sql_query(jackpot_query, conn).iloc[0]
 
         conn.close()